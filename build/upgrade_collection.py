@@ -10,6 +10,7 @@ License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
 """
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
 import xml.etree.ElementTree as ET
 
 
@@ -23,19 +24,33 @@ def indent(elem, level=0):
             elem.text = f'{i}  '
         if not elem.tail or not elem.tail.strip():
             elem.tail = i
-        if level < PARAGRAPH_LEVEL:
-            for elem in elem:
-                indent(elem, level + 1)
-        if not elem.tail or not elem.tail.strip():
-            elem.tail = i
     else:
         if level and (not elem.tail or not elem.tail.strip()):
             elem.tail = i
+    indents = [f'\n{n * "  "}' for n in range(PARAGRAPH_LEVEL + 2)]
+    stack = [(elem, level)]
+    while stack:
+        parent, level = stack.pop()
+        if level >= PARAGRAPH_LEVEL or not len(parent):
+            continue
+
+        i = indents[level]
+        childIndent = indents[level + 1]
+        for elem in parent:
+            if len(elem):
+                if not elem.text or not elem.text.strip():
+                    elem.text = indents[level + 2]
+                stack.append((elem, level + 1))
+            if not elem.tail or not elem.tail.strip():
+                elem.tail = childIndent
+        if not elem.tail or not elem.tail.strip():
+            elem.tail = i
 #!/usr/bin/python3
 SUFFIX = ''
 
 
 from nvyw7lib.yw7_file import Yw7File
+from operator import attrgetter
 
 
 class BasicElement:
@@ -91,8 +106,7 @@ class BasicElement:
     @links.setter
     def links(self, newVal):
         if newVal is not None:
-            for elem in newVal:
-                val = newVal[elem]
+            for val in newVal.values():
                 if val is not None:
                     assert type(val) == str
         if self._links != newVal:
@@ -122,7 +136,7 @@ class BasicElement:
         if self.title:
             ET.SubElement(xmlElement, 'Title').text = self.title
         if self.desc:
-            xmlElement.append(self._text_to_xml_element('Desc', self.desc))
+            self._text_to_xml_element(xmlElement, 'Desc', self.desc)
         for path in self.links:
             xmlLink = ET.SubElement(xmlElement, 'Link')
             ET.SubElement(xmlLink, 'Path').text = path
@@ -134,14 +148,15 @@ class BasicElement:
             xmlField.text = self.fields[tag]
 
     def _get_element_text(self, xmlElement, tag, default=None):
-        if xmlElement.find(tag) is not None:
-            return xmlElement.find(tag).text
-        else:
-            return default
+        element = xmlElement.find(tag)
+        return default if element is None else element.text
 
     def _get_fields(self, xmlElement):
         fields = {}
-        for xmlField in xmlElement.iterfind('Field'):
+        for xmlField in xmlElement:
+            if xmlField.tag != 'Field':
+                continue
+
             tag = xmlField.get('tag', None)
             if tag is not None:
                 fields[tag] = xmlField.text
@@ -149,15 +164,14 @@ class BasicElement:
 
     def _get_link_dict(self, xmlElement):
         links = {}
-        for xmlLink in xmlElement.iterfind('Link'):
+        for xmlLink in xmlElement:
+            if xmlLink.tag != 'Link':
+                continue
+
             xmlPath = xmlLink.find('Path')
             if xmlPath is not None:
                 path = xmlPath.text
-                xmlFullPath = xmlLink.find('FullPath')
-                if xmlFullPath is not None:
-                    fullPath = xmlFullPath.text
-                else:
-                    fullPath = None
+                fullPath = xmlLink.findtext('FullPath') or None
             else:
                 path = xmlLink.attrib.get('path', None)
                 fullPath = xmlLink.attrib.get('fullPath', None)
@@ -165,8 +179,8 @@ class BasicElement:
                 links[path] = fullPath
         return links
 
-    def _text_to_xml_element(self, tag, text):
-        xmlElement = ET.Element(tag)
+    def _text_to_xml_element(self, xmlParent, tag, text):
+        xmlElement = ET.SubElement(xmlParent, tag)
         if text:
             for line in text.split('\n'):
                 ET.SubElement(xmlElement, 'p').text = line
@@ -175,8 +189,9 @@ class BasicElement:
     def _xml_element_to_text(self, xmlElement):
         lines = []
         if xmlElement is not None:
-            for paragraph in xmlElement.iterfind('p'):
-                lines.append(''.join(t for t in paragraph.itertext()))
+            for paragraph in xmlElement:
+                if paragraph.tag == 'p':
+                    lines.append(''.join(paragraph.itertext()))
         return '\n'.join(lines)
 
 
@@ -208,7 +223,7 @@ class BasicElementNotes(BasicElement):
     def to_xml(self, xmlElement):
         super().to_xml(xmlElement)
         if self.notes:
-            xmlElement.append(self._text_to_xml_element('Notes', self.notes))
+            self._text_to_xml_element(xmlElement, 'Notes', self.notes)
 
 
 
@@ -276,31 +291,35 @@ class Chapter(BasicElementNotes):
 
     def from_xml(self, xmlElement):
         super().from_xml(xmlElement)
-        typeStr = xmlElement.get('type', '0')
-        if typeStr in ('0', '1'):
+        attrib = xmlElement.attrib
+        typeStr = attrib.get('type', '0')
+        if typeStr in {'0', '1'}:
             self.chType = int(typeStr)
         else:
             self.chType = 1
-        chLevel = xmlElement.get('level', None)
+        chLevel = attrib.get('level', None)
         if chLevel == '1':
             self.chLevel = 1
         else:
             self.chLevel = 2
-        self.isTrash = xmlElement.get('isTrash', None) == '1'
-        self.noNumber = xmlElement.get('noNumber', None) == '1'
+        self.isTrash = attrib.get('isTrash', None) == '1'
+        self.noNumber = attrib.get('noNumber', None) == '1'
 
     def to_xml(self, xmlElement):
         super().to_xml(xmlElement)
-        if self.chType:
-            xmlElement.set('type', str(self.chType))
-        if self.chLevel == 1:
-            xmlElement.set('level', '1')
-        if self.isTrash:
-            xmlElement.set('isTrash', '1')
-        if self.noNumber:
-            xmlElement.set('noNumber', '1')
+        attrib = {}
+        if self._chType:
+            attrib['type'] = str(self._chType)
+        if self._chLevel == 1:
+            attrib['level'] = '1'
+        if self._isTrash:
+            attrib['isTrash'] = '1'
+        if self._noNumber:
+            attrib['noNumber'] = '1'
+        xmlElement.attrib.update(attrib)
 from datetime import date
 from datetime import time
+from functools import lru_cache
 
 ROOT_PREFIX = 'rt'
 CHAPTER_PREFIX = 'ch'
@@ -358,44 +377,41 @@ def norm_path(path):
 
 
 def string_to_list(text, divider=';'):
-    elements = []
-    try:
-        tempList = text.split(divider)
-        for element in tempList:
-            element = element.strip()
-            if element and not element in elements:
-                elements.append(element)
-        return elements
-
-    except:
+    if not text:
         return []
 
+    elements = (element.strip() for element in text.split(divider))
+    return list(dict.fromkeys(element for element in elements if element))
 
-def list_to_string(elements, divider=';'):
-    try:
-        text = divider.join(elements)
-        return text
 
-    except:
+def list_to_string(elements, divider=';'):
+    if not elements:
         return ''
 
+    return divider.join(elements)
+
 
 def intersection(elemList, refList):
+    if not isinstance(refList, (dict, set, frozenset)):
+        refList = set(refList)
     return [elem for elem in elemList if elem in refList]
 
 
+@lru_cache(maxsize=1024)
 def verified_date(dateStr):
     if dateStr is not None:
         date.fromisoformat(dateStr)
     return dateStr
 
 
+@lru_cache(maxsize=1024)
 def verified_int_string(intStr):
     if intStr is not None:
         int(intStr)
     return intStr
 
 
+@lru_cache(maxsize=1024)
 def verified_time(timeStr):
     if  timeStr is not None:
         time.fromisoformat(timeStr)
@@ -429,11 +445,7 @@ class BasicElementTags(BasicElementNotes):
 
     def from_xml(self, xmlElement):
         super().from_xml(xmlElement)
-        tags = string_to_list(self._get_element_text(xmlElement, 'Tags'))
-        strippedTags = []
-        for tag in tags:
-            strippedTags.append(tag.strip())
-        self.tags = strippedTags
+        self.tags = string_to_list(self._get_element_text(xmlElement, 'Tags'))
 
     def to_xml(self, xmlElement):
         super().to_xml(xmlElement)
@@ -582,15 +594,16 @@ class Character(WorldElement):
         if self.fullName:
             ET.SubElement(xmlElement, 'FullName').text = self.fullName
         if self.bio:
-            xmlElement.append(self._text_to_xml_element('Bio', self.bio))
+            self._text_to_xml_element(xmlElement, 'Bio', self.bio)
         if self.goals:
-            xmlElement.append(self._text_to_xml_element('Goals', self.goals))
+            self._text_to_xml_element(xmlElement, 'Goals', self.goals)
         if self.birthDate:
             ET.SubElement(xmlElement, 'BirthDate').text = self.birthDate
         if self.deathDate:
             ET.SubElement(xmlElement, 'DeathDate').text = self.deathDate
 
 from datetime import date
+from functools import lru_cache
 import locale
 import re
 
@@ -598,6 +611,15 @@ import re
 LANGUAGE_TAG = re.compile(r'\<span xml\:lang=\"(.*?)\"\>')
 
 
+@lru_cache(maxsize=None)
+def get_system_locale():
+    try:
+        sysLng, sysCtr = locale.getlocale()[0].split('_')
+    except:
+        sysLng, sysCtr = locale.getdefaultlocale()[0].split('_')
+    return sysLng, sysCtr
+
+
 class Novel(BasicElement):
 
     def __init__(self,
@@ -983,10 +1005,7 @@ class Novel(BasicElement):
 
     def check_locale(self):
         if not self._languageCode or self._languageCode == 'None':
-            try:
-                sysLng, sysCtr = locale.getlocale()[0].split('_')
-            except:
-                sysLng, sysCtr = locale.getdefaultlocale()[0].split('_')
+            sysLng, sysCtr = get_system_locale()
             self._languageCode = sysLng
             self._countryCode = sysCtr
             self.on_element_change()
@@ -1004,14 +1023,15 @@ class Novel(BasicElement):
 
     def from_xml(self, xmlElement):
         super().from_xml(xmlElement)
-        self.renumberChapters = xmlElement.get('renumberChapters', None) == '1'
-        self.renumberParts = xmlElement.get('renumberParts', None) == '1'
-        self.renumberWithinParts = xmlElement.get('renumberWithinParts', None) == '1'
-        self.romanChapterNumbers = xmlElement.get('romanChapterNumbers', None) == '1'
-        self.romanPartNumbers = xmlElement.get('romanPartNumbers', None) == '1'
-        self.saveWordCount = xmlElement.get('saveWordCount', None) == '1'
-        workPhase = xmlElement.get('workPhase', None)
-        if workPhase in ('1', '2', '3', '4', '5'):
+        attrib = xmlElement.attrib
+        self.renumberChapters = attrib.get('renumberChapters', None) == '1'
+        self.renumberParts = attrib.get('renumberParts', None) == '1'
+        self.renumberWithinParts = attrib.get('renumberWithinParts', None) == '1'
+        self.romanChapterNumbers = attrib.get('romanChapterNumbers', None) == '1'
+        self.romanPartNumbers = attrib.get('romanPartNumbers', None) == '1'
+        self.saveWordCount = attrib.get('saveWordCount', None) == '1'
+        workPhase = attrib.get('workPhase', None)
+        if workPhase in {'1', '2', '3', '4', '5'}:
             self.workPhase = int(workPhase)
         else:
             self.workPhase = None
@@ -1035,83 +1055,60 @@ class Novel(BasicElement):
         self.customChrBio = self._get_element_text(xmlElement, 'CustomChrBio')
         self.customChrGoals = self._get_element_text(xmlElement, 'CustomChrGoals')
 
-        if xmlElement.find('WordCountStart') is not None:
-            self.wordCountStart = int(xmlElement.find('WordCountStart').text)
-        if xmlElement.find('WordTarget') is not None:
-            self.wordTarget = int(xmlElement.find('WordTarget').text)
+        xmlWordCountStart = xmlElement.find('WordCountStart')
+        if xmlWordCountStart is not None:
+            self.wordCountStart = int(xmlWordCountStart.text)
+        xmlWordTarget = xmlElement.find('WordTarget')
+        if xmlWordTarget is not None:
+            self.wordTarget = int(xmlWordTarget.text)
 
         self.referenceDate = verified_date(self._get_element_text(xmlElement, 'ReferenceDate'))
 
     def get_languages(self):
-
-        def languages(text):
-            if not text:
-                return
-
-            m = LANGUAGE_TAG.search(text)
-            while m:
-                text = text[m.span()[1]:]
-                yield m.group(1)
-                m = LANGUAGE_TAG.search(text)
-
-        self.languages = []
+        languages = {}
         for scId in self.sections:
             text = self.sections[scId].sectionContent
             if not text:
                 continue
 
-            for language in languages(text):
-                if not language in self.languages:
-                    self.languages.append(language)
+            for m in LANGUAGE_TAG.finditer(text):
+                languages[m.group(1)] = None
+        self.languages = list(languages)
 
     def to_xml(self, xmlElement):
         super().to_xml(xmlElement)
-        if self.renumberChapters:
-            xmlElement.set('renumberChapters', '1')
-        if self.renumberParts:
-            xmlElement.set('renumberParts', '1')
-        if self.renumberWithinParts:
-            xmlElement.set('renumberWithinParts', '1')
-        if self.romanChapterNumbers:
-            xmlElement.set('romanChapterNumbers', '1')
-        if self.romanPartNumbers:
-            xmlElement.set('romanPartNumbers', '1')
-        if self.saveWordCount:
-            xmlElement.set('saveWordCount', '1')
-        if self.workPhase is not None:
-            xmlElement.set('workPhase', str(self.workPhase))
-
-        if self.authorName:
-            ET.SubElement(xmlElement, 'Author').text = self.authorName
-
-        if self.chapterHeadingPrefix:
-            ET.SubElement(xmlElement, 'ChapterHeadingPrefix').text = self.chapterHeadingPrefix
-        if self.chapterHeadingSuffix:
-            ET.SubElement(xmlElement, 'ChapterHeadingSuffix').text = self.chapterHeadingSuffix
-
-        if self.partHeadingPrefix:
-            ET.SubElement(xmlElement, 'PartHeadingPrefix').text = self.partHeadingPrefix
-        if self.partHeadingSuffix:
-            ET.SubElement(xmlElement, 'PartHeadingSuffix').text = self.partHeadingSuffix
-
-        if self.customPlotProgress:
-            ET.SubElement(xmlElement, 'CustomPlotProgress').text = self.customPlotProgress
-        if self.customCharacterization:
-            ET.SubElement(xmlElement, 'CustomCharacterization').text = self.customCharacterization
-        if self.customWorldBuilding:
-            ET.SubElement(xmlElement, 'CustomWorldBuilding').text = self.customWorldBuilding
-
-        if self.customGoal:
-            ET.SubElement(xmlElement, 'CustomGoal').text = self.customGoal
-        if self.customConflict:
-            ET.SubElement(xmlElement, 'CustomConflict').text = self.customConflict
-        if self.customOutcome:
-            ET.SubElement(xmlElement, 'CustomOutcome').text = self.customOutcome
-
-        if self.customChrBio:
-            ET.SubElement(xmlElement, 'CustomChrBio').text = self.customChrBio
-        if self.customChrGoals:
-            ET.SubElement(xmlElement, 'CustomChrGoals').text = self.customChrGoals
+        attrib = {}
+        for attrName, flag in (
+            ('renumberChapters', self._renumberChapters),
+            ('renumberParts', self._renumberParts),
+            ('renumberWithinParts', self._renumberWithinParts),
+            ('romanChapterNumbers', self._romanChapterNumbers),
+            ('romanPartNumbers', self._romanPartNumbers),
+            ('saveWordCount', self._saveWordCount),
+        ):
+            if flag:
+                attrib[attrName] = '1'
+        if self._workPhase is not None:
+            attrib['workPhase'] = str(self._workPhase)
+        xmlElement.attrib.update(attrib)
+
+        for tag, text in (
+            ('Author', self._authorName),
+            ('ChapterHeadingPrefix', self._chapterHeadingPrefix),
+            ('ChapterHeadingSuffix', self._chapterHeadingSuffix),
+            ('PartHeadingPrefix', self._partHeadingPrefix),
+            ('PartHeadingSuffix', self._partHeadingSuffix),
+            ('CustomPlotProgress', self._customPlotProgress),
+            ('CustomCharacterization', self._customCharacterization),
+            ('CustomWorldBuilding', self._customWorldBuilding),
+            ('CustomGoal', self._customGoal),
+            ('CustomConflict', self._customConflict),
+            ('CustomOutcome', self._customOutcome),
+            ('CustomChrBio', self._customChrBio),
+            ('CustomChrGoals', self._customChrGoals),
+        ):
+            if text:
+                ET.SubElement(xmlElement, tag).text = text
 
         if self.wordCountStart:
             ET.SubElement(xmlElement, 'WordCountStart').text = str(self.wordCountStart)
@@ -1122,16 +1119,22 @@ class Novel(BasicElement):
             ET.SubElement(xmlElement, 'ReferenceDate').text = self.referenceDate
 
     def update_plot_lines(self):
+        plotLineSections = {}
+        sectionPlotPoints = {}
+        for plId in self.plotLines:
+            plotLineSections[plId] = set(self.plotLines[plId].sections)
+            for ppId in self.tree.get_children(plId):
+                sectionPlotPoints.setdefault((plId, self.plotPoints[ppId].sectionAssoc), ppId)
         for scId in self.sections:
-            self.sections[scId].scPlotPoints = {}
-            self.sections[scId].scPlotLines = []
+            section = self.sections[scId]
+            section.scPlotPoints = {}
+            section.scPlotLines = []
             for plId in self.plotLines:
-                if scId in self.plotLines[plId].sections:
-                    self.sections[scId].scPlotLines.append(plId)
-                    for ppId in self.tree.get_children(plId):
-                        if self.plotPoints[ppId].sectionAssoc == scId:
-                            self.sections[scId].scPlotPoints[ppId] = plId
-                            break
+                if scId in plotLineSections[plId]:
+                    section.scPlotLines.append(plId)
+                    ppId = sectionPlotPoints.get((plId, scId), None)
+                    if ppId is not None:
+                        section.scPlotPoints[ppId] = plId
 
 
 
@@ -1158,18 +1161,9 @@ class NvTree:
                 self.srtTurningPoints[iid] = []
             return
 
-        if parent.startswith(CHAPTER_PREFIX):
-            if parent in self.srtSections:
-                self.srtSections[parent].append(iid)
-            else:
-                self.srtSections[parent] = [iid]
-            return
-
-        if parent.startswith(PLOT_LINE_PREFIX):
-            if parent in self.srtTurningPoints:
-                self.srtTurningPoints[parent].append(iid)
-            else:
-                self.srtTurningPoints[parent] = [iid]
+        branch = self._get_branch(parent)
+        if branch is not None:
+            branch.setdefault(parent, []).append(iid)
 
     def delete(self, *items):
         raise NotImplementedError
@@ -1185,22 +1179,17 @@ class NvTree:
                 self.srtTurningPoints = {}
             return
 
-        if parent.startswith(CHAPTER_PREFIX):
-            self.srtSections[parent] = []
-            return
-
-        if parent.startswith(PLOT_LINE_PREFIX):
-            self.srtTurningPoints[parent] = []
+        branch = self._get_branch(parent)
+        if branch is not None:
+            branch[parent] = []
 
     def get_children(self, item):
         if item in self.roots:
             return self.roots[item]
 
-        if item.startswith(CHAPTER_PREFIX):
-            return self.srtSections.get(item, [])
-
-        if item.startswith(PLOT_LINE_PREFIX):
-            return self.srtTurningPoints.get(item, [])
+        branch = self._get_branch(item)
+        if branch is not None:
+            return branch.get(item, [])
 
     def index(self, item):
         raise NotImplementedError
@@ -1214,18 +1203,9 @@ class NvTree:
                 self.srtTurningPoints[iid] = []
             return
 
-        if parent.startswith(CHAPTER_PREFIX):
-            if parent in self.srtSections:
-                self.srtSections[parent].insert(index, iid)
-            else:
-                self.srtSections[parent] = [iid]
-            return
-
-        if parent.startswith(PLOT_LINE_PREFIX):
-            if parent in self.srtTurningPoints:
-                self.srtTurningPoints[parent].insert(index, iid)
-            else:
-                self.srtTurningPoints[parent] = [iid]
+        branch = self._get_branch(parent)
+        if branch is not None:
+            branch.setdefault(parent, []).insert(index, iid)
 
     def move(self, item, parent, index):
         raise NotImplementedError
@@ -1256,12 +1236,16 @@ class NvTree:
                 self.srtTurningPoints = {}
             return
 
+        branch = self._get_branch(item)
+        if branch is not None:
+            branch[item] = newchildren[:]
+
+    def _get_branch(self, item):
         if item.startswith(CHAPTER_PREFIX):
-            self.srtSections[item] = newchildren[:]
-            return
+            return self.srtSections
 
         if item.startswith(PLOT_LINE_PREFIX):
-            self.srtTurningPoints[item] = newchildren[:]
+            return self.srtTurningPoints
 
 
 
@@ -1313,16 +1297,15 @@ class PlotLine(BasicElementNotes):
         if xmlSections is not None:
             scIds = xmlSections.get('ids', None)
             if scIds is not None:
-                for scId in string_to_list(scIds, divider=' '):
-                    plSections.append(scId)
+                plSections = list(dict.fromkeys(map(sys.intern, scIds.split())))
         self.sections = plSections
 
     def to_xml(self, xmlElement):
         super().to_xml(xmlElement)
         if self.shortName:
             ET.SubElement(xmlElement, 'ShortName').text = self.shortName
-        if self.sections:
-            attrib = {'ids':' '.join(self.sections)}
+        if self._sections:
+            attrib = {'ids':' '.join(self._sections)}
             ET.SubElement(xmlElement, 'Sections', attrib=attrib)
 
 
@@ -1356,11 +1339,12 @@ class PlotPoint(BasicElementNotes):
     def to_xml(self, xmlElement):
         super().to_xml(xmlElement)
         if self.sectionAssoc:
-            ET.SubElement(xmlElement, 'Section', attrib={'id': self.sectionAssoc})
+            ET.SubElement(xmlElement, 'Section').set('id', self.sectionAssoc)
 from datetime import date
 from datetime import datetime
 from datetime import time
 from datetime import timedelta
+from functools import lru_cache
 
 from calendar import isleap
 from datetime import date
@@ -1370,9 +1354,9 @@ from datetime import timedelta
 
 def difference_in_years(startDate, endDate):
     diffyears = endDate.year - startDate.year
-    difference = endDate - startDate.replace(endDate.year)
+    difference = endDate.toordinal() - startDate.replace(endDate.year).toordinal()
     days_in_year = isleap(endDate.year) and 366 or 365
-    years = diffyears + (difference.days + difference.seconds / 86400.0) / days_in_year
+    years = diffyears + difference / days_in_year
     return int(years)
 
 
@@ -1422,9 +1406,19 @@ WEEKDAYS = calendar.day_name
 MONTHS = calendar.month_name
 
 
-ADDITIONAL_WORD_LIMITS = re.compile(r'--|—|–|\<\/p\>')
+NO_WORD_LIMITS = re.compile(r'\<(?:note\>.*?\<\/note\>|comment\>.*?\<\/comment\>|[^>\n]+\>)')
+
+LINE_BREAKS = re.compile(r'\s*\n\s*')
+
 
-NO_WORD_LIMITS = re.compile(r'\<note\>.*?\<\/note\>|\<comment\>.*?\<\/comment\>|\<.+?\>')
+@lru_cache(maxsize=1024)
+def get_week_day_and_locale_date(isoDate):
+    newDate = date.fromisoformat(isoDate)
+    try:
+        localeDate = newDate.strftime('%x')
+    except:
+        localeDate = isoDate
+    return newDate.weekday(), localeDate
 
 
 class Section(BasicElementTags):
@@ -1475,13 +1469,9 @@ class Section(BasicElementTags):
         self._outcome = outcome
         self._plotlineNotes = plotNotes
         try:
-            newDate = date.fromisoformat(scDate)
-            self._weekDay = newDate.weekday()
-            self._localeDate = newDate.strftime('%x')
+            date.fromisoformat(scDate)
             self._date = scDate
         except:
-            self._weekDay = None
-            self._localeDate = None
             self._date = None
         self._time = scTime
         self._day = day
@@ -1495,9 +1485,7 @@ class Section(BasicElementTags):
         self.scPlotLines = []
         self.scPlotPoints = {}
 
-    @property
-    def sectionContent(self):
-        return self._sectionContent
+    sectionContent = property(attrgetter('_sectionContent'))
 
     @sectionContent.setter
     def sectionContent(self, text):
@@ -1506,7 +1494,7 @@ class Section(BasicElementTags):
         if self._sectionContent != text:
             self._sectionContent = text
             if text is not None:
-                text = ADDITIONAL_WORD_LIMITS.sub(' ', text)
+                text = text.replace('--', ' ').replace('—', ' ').replace('–', ' ').replace('</p>', ' ')
                 text = NO_WORD_LIMITS.sub('', text)
                 wordList = text.split()
                 self.wordCount = len(wordList)
@@ -1608,8 +1596,7 @@ class Section(BasicElementTags):
     @plotlineNotes.setter
     def plotlineNotes(self, newVal):
         if newVal is not None:
-            for elem in newVal:
-                val = newVal[elem]
+            for val in newVal.values():
                 if val is not None:
                     assert type(val) == str
         if self._plotlineNotes != newVal:
@@ -1627,31 +1614,26 @@ class Section(BasicElementTags):
         if self._date != newVal:
             if not newVal:
                 self._date = None
-                self._weekDay = None
-                self._localeDate = None
                 self.on_element_change()
                 return
 
             try:
-                newDate = date.fromisoformat(newVal)
-                self._weekDay = newDate.weekday()
+                date.fromisoformat(newVal)
             except:
                 return
 
-            try:
-                self._localeDate = newDate.strftime('%x')
-            except:
-                self._localeDate = newVal
             self._date = newVal
             self.on_element_change()
 
     @property
     def weekDay(self):
-        return self._weekDay
+        if self._date:
+            return get_week_day_and_locale_date(self._date)[0]
 
     @property
     def localeDate(self):
-        return self._localeDate
+        if self._date:
+            return get_week_day_and_locale_date(self._date)[1]
 
     @property
     def time(self):
@@ -1794,94 +1776,93 @@ class Section(BasicElementTags):
         super().from_xml(xmlElement)
 
         typeStr = xmlElement.get('type', '0')
-        if typeStr in ('0', '1', '2', '3'):
+        if typeStr in {'0', '1', '2', '3'}:
             self.scType = int(typeStr)
         else:
             self.scType = 1
         status = xmlElement.get('status', None)
-        if status in ('2', '3', '4', '5'):
+        if status in {'2', '3', '4', '5'}:
             self.status = int(status)
         else:
             self.status = 1
         scene = xmlElement.get('scene', 0)
-        if scene in ('1', '2', '3'):
+        if scene in {'1', '2', '3'}:
             self.scene = int(scene)
         else:
             self.scene = 0
 
         if not self.scene:
             sceneKind = xmlElement.get('pacing', None)
-            if sceneKind in ('1', '2'):
+            if sceneKind in {'1', '2'}:
                 self.scene = int(sceneKind) + 1
 
         self.appendToPrev = xmlElement.get('append', None) == '1'
 
-        self.goal = self._xml_element_to_text(xmlElement.find('Goal'))
-        self.conflict = self._xml_element_to_text(xmlElement.find('Conflict'))
-        self.outcome = self._xml_element_to_text(xmlElement.find('Outcome'))
+        xmlChildren = {xmlChild.tag: xmlChild for xmlChild in reversed(xmlElement)}
+        self.goal = self._xml_element_to_text(xmlChildren.get('Goal', None))
+        self.conflict = self._xml_element_to_text(xmlChildren.get('Conflict', None))
+        self.outcome = self._xml_element_to_text(xmlChildren.get('Outcome', None))
 
-        xmlPlotNotes = xmlElement.find('PlotNotes')
+        xmlPlotNotes = xmlChildren.get('PlotNotes', None)
         if xmlPlotNotes is None:
             xmlPlotNotes = xmlElement
         plotNotes = {}
-        for xmlPlotLineNote in xmlPlotNotes.iterfind('PlotlineNotes'):
+        for xmlPlotLineNote in xmlPlotNotes:
+            if xmlPlotLineNote.tag != 'PlotlineNotes':
+                continue
+
             plId = xmlPlotLineNote.get('id', None)
             plotNotes[plId] = self._xml_element_to_text(xmlPlotLineNote)
         self.plotlineNotes = plotNotes
 
-        if xmlElement.find('Date') is not None:
-            self.date = verified_date(xmlElement.find('Date').text)
-        elif xmlElement.find('Day') is not None:
-            self.day = verified_int_string(xmlElement.find('Day').text)
+        xmlDate = xmlChildren.get('Date', None)
+        xmlDay = xmlChildren.get('Day', None)
+        if xmlDate is not None:
+            self.date = verified_date(xmlDate.text)
+        elif xmlDay is not None:
+            self.day = verified_int_string(xmlDay.text)
 
-        if xmlElement.find('Time') is not None:
-            self.time = verified_time(xmlElement.find('Time').text)
+        xmlTime = xmlChildren.get('Time', None)
+        if xmlTime is not None:
+            self.time = verified_time(xmlTime.text)
 
         self.lastsDays = verified_int_string(self._get_element_text(xmlElement, 'LastsDays'))
         self.lastsHours = verified_int_string(self._get_element_text(xmlElement, 'LastsHours'))
         self.lastsMinutes = verified_int_string(self._get_element_text(xmlElement, 'LastsMinutes'))
 
         scCharacters = []
-        xmlCharacters = xmlElement.find('Characters')
+        xmlCharacters = xmlChildren.get('Characters', None)
         if xmlCharacters is not None:
             crIds = xmlCharacters.get('ids', None)
             if crIds is not None:
-                for crId in string_to_list(crIds, divider=' '):
-                    scCharacters.append(crId)
+                scCharacters = list(dict.fromkeys(map(sys.intern, crIds.split())))
         self.characters = scCharacters
 
         scLocations = []
-        xmlLocations = xmlElement.find('Locations')
+        xmlLocations = xmlChildren.get('Locations', None)
         if xmlLocations is not None:
             lcIds = xmlLocations.get('ids', None)
             if lcIds is not None:
-                for lcId in string_to_list(lcIds, divider=' '):
-                    scLocations.append(lcId)
+                scLocations = list(dict.fromkeys(map(sys.intern, lcIds.split())))
         self.locations = scLocations
 
         scItems = []
-        xmlItems = xmlElement.find('Items')
+        xmlItems = xmlChildren.get('Items', None)
         if xmlItems is not None:
             itIds = xmlItems.get('ids', None)
             if itIds is not None:
-                for itId in string_to_list(itIds, divider=' '):
-                    scItems.append(itId)
+                scItems = list(dict.fromkeys(map(sys.intern, itIds.split())))
         self.items = scItems
 
-        xmlContent = xmlElement.find('Content')
+        xmlContent = xmlChildren.get('Content', None)
         if xmlContent is not None:
             xmlStr = ET.tostring(
                 xmlContent,
-                encoding='utf-8',
+                encoding='unicode',
                 short_empty_elements=False
-                ).decode('utf-8')
-            xmlStr = xmlStr.replace('<Content>', '').replace('</Content>', '')
-
-            lines = xmlStr.split('\n')
-            newlines = []
-            for line in lines:
-                newlines.append(line.strip())
-            xmlStr = ''.join(newlines)
+                )
+            xmlStr = xmlStr[xmlStr.index('>') + 1:xmlStr.rindex('</Content>')]
+            xmlStr = LINE_BREAKS.sub('', xmlStr).strip()
             if xmlStr:
                 self.sectionContent = xmlStr
             else:
@@ -1907,9 +1888,10 @@ class Section(BasicElementTags):
         if self.time:
             if self.date:
                 try:
-                    sectionStart = datetime.fromisoformat(f'{self.date} {self.time}')
+                    sectionStart = datetime.combine(date.fromisoformat(self.date), time.fromisoformat(self.time))
                     sectionEnd = sectionStart + sectionDuration
-                    endDate, endTime = sectionEnd.isoformat().split('T')
+                    endDate = sectionEnd.date().isoformat()
+                    endTime = sectionEnd.time().isoformat()
                 except:
                     pass
             else:
@@ -1918,73 +1900,69 @@ class Section(BasicElementTags):
                         dayInt = int(self.day)
                     else:
                         dayInt = 0
-                    startDate = (date.min + timedelta(days=dayInt)).isoformat()
-                    sectionStart = datetime.fromisoformat(f'{startDate} {self.time}')
+                    startDate = date.min + timedelta(days=dayInt)
+                    sectionStart = datetime.combine(startDate, time.fromisoformat(self.time))
                     sectionEnd = sectionStart + sectionDuration
-                    endDate, endTime = sectionEnd.isoformat().split('T')
-                    endDay = str((date.fromisoformat(endDate) - date.min).days)
-                    endDate = None
+                    endTime = sectionEnd.time().isoformat()
+                    endDay = str((sectionEnd.date() - date.min).days)
                 except:
                     pass
         return endDate, endTime, endDay
 
     def to_xml(self, xmlElement):
         super().to_xml(xmlElement)
-        if self.scType:
-            xmlElement.set('type', str(self.scType))
-        if self.status > 1:
-            xmlElement.set('status', str(self.status))
-        if self.scene > 0:
-            xmlElement.set('scene', str(self.scene))
-        if self.appendToPrev:
+        if self._scType:
+            xmlElement.set('type', str(self._scType))
+        if self._status > 1:
+            xmlElement.set('status', str(self._status))
+        if self._scene > 0:
+            xmlElement.set('scene', str(self._scene))
+        if self._appendToPrev:
             xmlElement.set('append', '1')
 
-        if self.goal:
-            xmlElement.append(self._text_to_xml_element('Goal', self.goal))
-        if self.conflict:
-            xmlElement.append(self._text_to_xml_element('Conflict', self.conflict))
-        if self.outcome:
-            xmlElement.append(self._text_to_xml_element('Outcome', self.outcome))
+        for tag, text in (
+            ('Goal', self._goal),
+            ('Conflict', self._conflict),
+            ('Outcome', self._outcome),
+        ):
+            if text:
+                self._text_to_xml_element(xmlElement, tag, text)
 
-        if self.plotlineNotes:
-            for plId in self.plotlineNotes:
+        if self._plotlineNotes:
+            for plId, plotlineNote in self._plotlineNotes.items():
                 if not plId in self.scPlotLines:
                     continue
 
-                if not self.plotlineNotes[plId]:
+                if not plotlineNote:
                     continue
 
-                xmlPlotlineNotes = self._text_to_xml_element('PlotlineNotes', self.plotlineNotes[plId])
+                xmlPlotlineNotes = self._text_to_xml_element(xmlElement, 'PlotlineNotes', plotlineNote)
                 xmlPlotlineNotes.set('id', plId)
-                xmlElement.append(xmlPlotlineNotes)
-
-        if self.date:
-            ET.SubElement(xmlElement, 'Date').text = self.date
-        elif self.day:
-            ET.SubElement(xmlElement, 'Day').text = self.day
-        if self.time:
-            ET.SubElement(xmlElement, 'Time').text = self.time
-
-        if self.lastsDays and self.lastsDays != '0':
-            ET.SubElement(xmlElement, 'LastsDays').text = self.lastsDays
-        if self.lastsHours and self.lastsHours != '0':
-            ET.SubElement(xmlElement, 'LastsHours').text = self.lastsHours
-        if self.lastsMinutes and self.lastsMinutes != '0':
-            ET.SubElement(xmlElement, 'LastsMinutes').text = self.lastsMinutes
-
-        if self.characters:
-            attrib = {'ids':' '.join(self.characters)}
-            ET.SubElement(xmlElement, 'Characters', attrib=attrib)
-
-        if self.locations:
-            attrib = {'ids':' '.join(self.locations)}
-            ET.SubElement(xmlElement, 'Locations', attrib=attrib)
 
-        if self.items:
-            attrib = {'ids':' '.join(self.items)}
-            ET.SubElement(xmlElement, 'Items', attrib=attrib)
-
-        sectionContent = self.sectionContent
+        if self._date:
+            ET.SubElement(xmlElement, 'Date').text = self._date
+        elif self._day:
+            ET.SubElement(xmlElement, 'Day').text = self._day
+        if self._time:
+            ET.SubElement(xmlElement, 'Time').text = self._time
+
+        for tag, text in (
+            ('LastsDays', self._lastsDays),
+            ('LastsHours', self._lastsHours),
+            ('LastsMinutes', self._lastsMinutes),
+        ):
+            if text and text != '0':
+                ET.SubElement(xmlElement, tag).text = text
+
+        for tag, ids in (
+            ('Characters', self._characters),
+            ('Locations', self._locations),
+            ('Items', self._items),
+        ):
+            if ids:
+                ET.SubElement(xmlElement, tag).set('ids', ' '.join(ids))
+
+        sectionContent = self._sectionContent
         if sectionContent:
             if not sectionContent in ('<p></p>', '<p />'):
                 xmlElement.append(ET.fromstring(f'<Content>{sectionContent}</Content>'))
@@ -2019,14 +1997,15 @@ class File(ABC):
             suffix = self.SUFFIX
         else:
             suffix = ''
-        if filePath.lower().endswith(f'{suffix}{self.EXTENSION}'.lower()):
+        ending = f'{suffix}{self.EXTENSION}'
+        if filePath[len(filePath) - len(ending):].lower() == ending.lower():
             self._filePath = filePath
             try:
                 head, tail = os.path.split(os.path.realpath(filePath))
             except:
                 head, tail = os.path.split(filePath)
             self.projectPath = quote(head.replace('\\', '/'), '/:')
-            self.projectName = quote(tail.replace(f'{suffix}{self.EXTENSION}', ''))
+            self.projectName = quote(tail.replace(ending, ''))
 
     def is_locked(self):
         return False
@@ -2043,6 +2022,26 @@ def strip_illegal_characters(text):
     return re.sub('[\x00-\x08|\x0b-\x0c|\x0e-\x1f]', '', text)
 
 
+class IllegalCharacterFilter:
+
+    def __init__(self, file, bufferSize=65536):
+        self._file = file
+        self._bufferSize = bufferSize
+        self._chunks = []
+        self._size = 0
+
+    def flush(self):
+        self._file.write(strip_illegal_characters(''.join(self._chunks)))
+        self._chunks = []
+        self._size = 0
+
+    def write(self, text):
+        self._chunks.append(text)
+        self._size += len(text)
+        if self._size >= self._bufferSize:
+            self.flush()
+
+
 
 def get_xml_root(filePath):
     try:
@@ -2077,26 +2076,38 @@ class NovxFile(File):
         self.timestamp = None
 
     def adjust_section_types(self):
+        chapters = self.novel.chapters
+        sections = self.novel.sections
+        get_children = self.novel.tree.get_children
         partType = 0
-        for chId in self.novel.tree.get_children(CH_ROOT):
-            if self.novel.chapters[chId].chLevel == 1:
-                partType = self.novel.chapters[chId].chType
-            elif partType != 0 and not self.novel.chapters[chId].isTrash:
-                self.novel.chapters[chId].chType = partType
-            for scId in self.novel.tree.get_children(chId):
-                if self.novel.sections[scId].scType < self.novel.chapters[chId].chType:
-                    self.novel.sections[scId].scType = self.novel.chapters[chId].chType
+        for chId in get_children(CH_ROOT):
+            chapter = chapters[chId]
+            if chapter.chLevel == 1:
+                partType = chapter.chType
+            elif partType != 0 and not chapter.isTrash:
+                chapter.chType = partType
+            chType = chapter.chType
+            for scId in get_children(chId):
+                section = sections[scId]
+                if section.scType < chType:
+                    section.scType = chType
 
     def count_words(self):
         count = 0
         totalCount = 0
-        for chId in self.novel.tree.get_children(CH_ROOT):
-            if not self.novel.chapters[chId].isTrash:
-                for scId in self.novel.tree.get_children(chId):
-                    if self.novel.sections[scId].scType < 2:
-                        totalCount += self.novel.sections[scId].wordCount
-                        if self.novel.sections[scId].scType == 0:
-                            count += self.novel.sections[scId].wordCount
+        chapters = self.novel.chapters
+        sections = self.novel.sections
+        get_children = self.novel.tree.get_children
+        for chId in get_children(CH_ROOT):
+            if not chapters[chId].isTrash:
+                for scId in get_children(chId):
+                    section = sections[scId]
+                    scType = section.scType
+                    if scType < 2:
+                        wordCount = section.wordCount
+                        totalCount += wordCount
+                        if scType == 0:
+                            count += wordCount
         return count, totalCount
 
     def read(self):
@@ -2146,7 +2157,7 @@ class NovxFile(File):
 
         self.xmlTree = ET.ElementTree(xmlRoot)
         self._write_element_tree(self)
-        self._postprocess_xml_file(self.filePath)
+        self.xmlTree = None
         self._get_timestamp()
 
     def _build_project(self, root):
@@ -2154,59 +2165,81 @@ class NovxFile(File):
         self.novel.to_xml(xmlProject)
 
     def _build_chapters_and_sections(self, root):
-        xmlChapters = ET.SubElement(root, 'CHAPTERS')
-        for chId in self.novel.tree.get_children(CH_ROOT):
-            xmlChapter = ET.SubElement(xmlChapters, 'CHAPTER', attrib={'id':chId})
-            self.novel.chapters[chId].to_xml(xmlChapter)
-            for scId in self.novel.tree.get_children(chId):
-                self.novel.sections[scId].to_xml(ET.SubElement(xmlChapter, 'SECTION', attrib={'id':scId}))
+        SubElement = ET.SubElement
+        chapters = self.novel.chapters
+        sections = self.novel.sections
+        get_children = self.novel.tree.get_children
+        xmlChapters = SubElement(root, 'CHAPTERS')
+        for chId in get_children(CH_ROOT):
+            xmlChapter = SubElement(xmlChapters, 'CHAPTER')
+            xmlChapter.set('id', chId)
+            chapters[chId].to_xml(xmlChapter)
+            for scId in get_children(chId):
+                xmlSection = SubElement(xmlChapter, 'SECTION')
+                xmlSection.set('id', scId)
+                sections[scId].to_xml(xmlSection)
 
     def _build_characters(self, root):
         xmlCharacters = ET.SubElement(root, 'CHARACTERS')
         for crId in self.novel.tree.get_children(CR_ROOT):
-            self.novel.characters[crId].to_xml(ET.SubElement(xmlCharacters, 'CHARACTER', attrib={'id':crId}))
+            xmlCharacter = ET.SubElement(xmlCharacters, 'CHARACTER')
+            xmlCharacter.set('id', crId)
+            self.novel.characters[crId].to_xml(xmlCharacter)
 
     def _build_locations(self, root):
         xmlLocations = ET.SubElement(root, 'LOCATIONS')
         for lcId in self.novel.tree.get_children(LC_ROOT):
-            self.novel.locations[lcId].to_xml(ET.SubElement(xmlLocations, 'LOCATION', attrib={'id':lcId}))
+            xmlLocation = ET.SubElement(xmlLocations, 'LOCATION')
+            xmlLocation.set('id', lcId)
+            self.novel.locations[lcId].to_xml(xmlLocation)
 
     def _build_items(self, root):
         xmlItems = ET.SubElement(root, 'ITEMS')
         for itId in self.novel.tree.get_children(IT_ROOT):
-            self.novel.items[itId].to_xml(ET.SubElement(xmlItems, 'ITEM', attrib={'id':itId}))
+            xmlItem = ET.SubElement(xmlItems, 'ITEM')
+            xmlItem.set('id', itId)
+            self.novel.items[itId].to_xml(xmlItem)
 
     def _build_plot_lines_and_points(self, root):
-        xmlPlotLines = ET.SubElement(root, 'ARCS')
-        for plId in self.novel.tree.get_children(PL_ROOT):
-            xmlPlotLine = ET.SubElement(xmlPlotLines, 'ARC', attrib={'id':plId})
-            self.novel.plotLines[plId].to_xml(xmlPlotLine)
-            for ppId in self.novel.tree.get_children(plId):
-                self.novel.plotPoints[ppId].to_xml(ET.SubElement(xmlPlotLine, 'POINT', attrib={'id':ppId}))
+        SubElement = ET.SubElement
+        plotLines = self.novel.plotLines
+        plotPoints = self.novel.plotPoints
+        get_children = self.novel.tree.get_children
+        xmlPlotLines = SubElement(root, 'ARCS')
+        for plId in get_children(PL_ROOT):
+            xmlPlotLine = SubElement(xmlPlotLines, 'ARC')
+            xmlPlotLine.set('id', plId)
+            plotLines[plId].to_xml(xmlPlotLine)
+            for ppId in get_children(plId):
+                xmlPlotPoint = SubElement(xmlPlotLine, 'POINT')
+                xmlPlotPoint.set('id', ppId)
+                plotPoints[ppId].to_xml(xmlPlotPoint)
 
     def _build_project_notes(self, root):
         xmlProjectNotes = ET.SubElement(root, 'PROJECTNOTES')
         for pnId in self.novel.tree.get_children(PN_ROOT):
-            self.novel.projectNotes[pnId].to_xml(ET.SubElement(xmlProjectNotes, 'PROJECTNOTE', attrib={'id':pnId}))
+            xmlProjectNote = ET.SubElement(xmlProjectNotes, 'PROJECTNOTE')
+            xmlProjectNote.set('id', pnId)
+            self.novel.projectNotes[pnId].to_xml(xmlProjectNote)
 
     def _build_word_count_log(self, root):
         if not self.wcLog:
             return
 
-        xmlWcLog = ET.SubElement(root, 'PROGRESS')
-        wcLastCount = None
-        wcLastTotalCount = None
-        for wc in self.wcLog:
+        SubElement = ET.SubElement
+        xmlWcLog = SubElement(root, 'PROGRESS')
+        wcLastEntry = None
+        for wcDate, wcEntry in self.wcLog.items():
             if self.novel.saveWordCount:
-                if self.wcLog[wc][0] == wcLastCount and self.wcLog[wc][1] == wcLastTotalCount:
+                if wcEntry == wcLastEntry:
                     continue
 
-                wcLastCount = self.wcLog[wc][0]
-                wcLastTotalCount = self.wcLog[wc][1]
-            xmlWc = ET.SubElement(xmlWcLog, 'WC')
-            ET.SubElement(xmlWc, 'Date').text = wc
-            ET.SubElement(xmlWc, 'Count').text = self.wcLog[wc][0]
-            ET.SubElement(xmlWc, 'WithUnused').text = self.wcLog[wc][1]
+                wcLastEntry = wcEntry
+            wcCount, wcTotalCount = wcEntry
+            xmlWc = SubElement(xmlWcLog, 'WC')
+            SubElement(xmlWc, 'Date').text = wcDate
+            SubElement(xmlWc, 'Count').text = wcCount
+            SubElement(xmlWc, 'WithUnused').text = wcTotalCount
 
     def _check_id(self, elemId, elemPrefix):
         if not elemId.startswith(elemPrefix):
@@ -2241,9 +2274,11 @@ class NovxFile(File):
         actualCountInt, actualTotalCountInt = self.count_words()
         actualCount = str(actualCountInt)
         actualTotalCount = str(actualTotalCountInt)
-        latestDate = list(self.wcLog)[-1]
-        latestCount = self.wcLog[latestDate][0]
-        latestTotalCount = self.wcLog[latestDate][1]
+        try:
+            latestDate = next(reversed(self.wcLog))
+        except TypeError:
+            latestDate = list(self.wcLog)[-1]
+        latestCount, latestTotalCount = self.wcLog[latestDate]
         if actualCount != latestCount or actualTotalCount != latestTotalCount:
             try:
                 fileDateIso = date.fromtimestamp(self.timestamp).isoformat()
@@ -2251,16 +2286,6 @@ class NovxFile(File):
                 fileDateIso = date.today().isoformat()
             self.wcLogUpdate[fileDateIso] = [actualCount, actualTotalCount]
 
-    def _postprocess_xml_file(self, filePath):
-        with open(filePath, 'r', encoding='utf-8') as f:
-            text = f.read()
-            text = strip_illegal_characters(text)
-        try:
-            with open(filePath, 'w', encoding='utf-8') as f:
-                f.write(f'{self.XML_HEADER}{text}')
-        except:
-            raise Error(f'{_("Cannot write file")}: "{norm_path(filePath)}".')
-
     def _read_chapters_and_sections(self, root):
         xmlChapters = root.find('CHAPTERS')
         if xmlChapters is None:
@@ -2394,8 +2419,23 @@ class NovxFile(File):
             newTotalCount = str(newTotalCountInt)
             todayIso = date.today().isoformat()
             self.wcLogUpdate[todayIso] = [newCount, newTotalCount]
-            for wcDate in self.wcLogUpdate:
-                self.wcLog[wcDate] = self.wcLogUpdate[wcDate]
+            if self.wcLog:
+                try:
+                    latestDate = next(reversed(self.wcLog))
+                except TypeError:
+                    latestDate = list(self.wcLog)[-1]
+            else:
+                latestDate = ''
+            unsorted = False
+            for wcDate, wcEntry in self.wcLogUpdate.items():
+                if wcDate >= latestDate:
+                    self.wcLog.pop(wcDate, None)
+                    latestDate = wcDate
+                elif not wcDate in self.wcLog:
+                    unsorted = True
+                self.wcLog[wcDate] = wcEntry
+            if unsorted:
+                self.wcLog = dict(sorted(self.wcLog.items()))
         self.wcLogUpdate = {}
 
     def _write_element_tree(self, xmlProject):
@@ -2408,7 +2448,11 @@ class NovxFile(File):
             else:
                 backedUp = True
         try:
-            xmlProject.xmlTree.write(xmlProject.filePath, xml_declaration=False, encoding='utf-8')
+            with open(xmlProject.filePath, 'w', encoding='utf-8', errors='xmlcharrefreplace') as f:
+                f.write(xmlProject.XML_HEADER)
+                xmlFilter = IllegalCharacterFilter(f)
+                xmlProject.xmlTree.write(xmlFilter, encoding='unicode')
+                xmlFilter.flush()
         except:
             if backedUp:
                 os.replace(f'{xmlProject.filePath}.bak', xmlProject.filePath)
@@ -2476,49 +2520,87 @@ XML_HEADER = '''<?xml version="1.0" encoding="utf-8"?>
 <?xml-stylesheet href="collection.css" type="text/css"?>
 '''
 
-
-def postprocess_xml_file(filePath):
-    """Postprocess an xml file created by ElementTree.
-    
-    Positional argument:
-        filePath -- str: path to xml file.
-    
-    Read the xml file, put a header on top. Overwrite the .nvcx xml file.
-    """
-    with open(filePath, 'r', encoding='utf-8') as f:
-        text = f.read()
-    with open(filePath, 'w', encoding='utf-8') as f:
-        f.write(f'{XML_HEADER}{text}')
+V1_MAP = {
+    'collection':'collection',
+    'series':'series',
+    'book':'book',
+    'id':'id',
+    'path':'path',
+    'title':'title',
+    'desc':'desc',
+}
+OLD_MAP = {
+    'collection':'COLLECTION',
+    'series':'SERIES',
+    'book':'BOOK',
+    'id':'ID',
+    'path':'Path',
+    'title':'Title',
+    'desc':'Desc',
+}
+SOURCE_MAPS = {
+    'collection':V1_MAP,
+    'COLLECTION':OLD_MAP,
+}
+
+TARGET_ELEMENTS = {
+    'collection':{
+        'book':('BOOK', 'bk'),
+        'series':('SERIES', 'sr'),
+    },
+    'COLLECTION':{
+        'BOOK':('BOOK', 'bk'),
+        'SERIES':('SERIES', 'sr'),
+    },
+}
 
 
 def convert(sourcePath):
 
+    def is_file(filePath):
+        dirPath, fileName = os.path.split(os.path.normcase(filePath))
+        fileNames = dirFiles.get(dirPath, None)
+        if fileNames is None:
+            fileNames = set()
+            try:
+                with os.scandir(dirPath or '.') as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            fileNames.add(os.path.normcase(entry.name))
+            except OSError:
+                pass
+            dirFiles[dirPath] = fileNames
+        if fileName in fileNames:
+            return True
+
+        return os.path.isfile(filePath)
+
     def set_element(xmlElement, targetElement, prefix):
-        elemId = xmlElement.attrib[xmlMap['id']]
+        elemId = xmlElement.attrib[idAttr]
         targetElement.set('id', f"{prefix}{elemId}")
-        xmlTitle = xmlElement.find(xmlMap['title'])
+        xmlTitle = xmlElement.find(titleTag)
         if xmlTitle is not None:
             title = xmlTitle.text
             if title:
                 ET.SubElement(targetElement, 'Title').text = title
-        xmlDesc = xmlElement.find(xmlMap['desc'])
+        xmlDesc = xmlElement.find(descTag)
         if xmlDesc is not None:
             desc = xmlDesc.text
             if desc:
                 targetDesc = ET.SubElement(targetElement, 'Desc')
                 for paragraph in desc.split('\n'):
                     ET.SubElement(targetDesc, 'p').text = paragraph.strip()
-        xmlPath = xmlElement.find(xmlMap['path'])
+        xmlPath = xmlElement.find(pathTag)
         if xmlPath is not None:
 
             yw7Path = xmlPath.text
-            if yw7Path and os.path.isfile(yw7Path):
+            if yw7Path and is_file(yw7Path):
                 bookPath, bookExt = os.path.splitext(yw7Path)
                 if bookExt == '.yw7':
                     novxPath = f'{bookPath}.novx'
-                    if not os.path.isfile(novxPath):
+                    if not is_file(novxPath):
 
-                        yw_novx(yw7Path)
+                        pending[yw7Path] = None
                     ET.SubElement(targetElement, 'Path').text = novxPath
 
     pathRoot , extension = os.path.splitext(sourcePath)
@@ -2526,70 +2608,80 @@ def convert(sourcePath):
         raise ValueError(f'File must be .pwc type, but is "{extension}".')
     targetPath = f'{pathRoot}.nvcx'
 
-    v1Map = dict(
-            collection='collection',
-            series='series',
-            book='book',
-            id='id',
-            path='path',
-            title='title',
-            desc='desc',
-            )
-    oldMap = dict(
-            collection='COLLECTION',
-            series='SERIES',
-            book='BOOK',
-            id='ID',
-            path='Path',
-            title='Title',
-            desc='Desc',
-            )
-    xmlSourceTree = ET.parse(sourcePath)
-    xmlRoot = xmlSourceTree.getroot()
-    if xmlRoot.tag == v1Map['collection']:
-        xmlMap = v1Map
-    elif xmlRoot.tag == oldMap['collection']:
-        xmlMap = oldMap
-    else:
+    xmlEvents = ET.iterparse(sourcePath, events=('start', 'end'))
+    __, xmlRoot = next(xmlEvents)
+    xmlMap = SOURCE_MAPS.get(xmlRoot.tag, None)
+    if xmlMap is None:
         raise Exception(f'No collection found in file: "{os.path.normpath(sourcePath)}".')
 
-    try:
-        majorVersionStr, minorVersionStr = xmlRoot.attrib['version'].split('.')
-        majorVersion = int(majorVersionStr)
-    except:
+    targetElements = TARGET_ELEMENTS[xmlRoot.tag]
+    version = xmlRoot.get('version', '')
+    dot = version.find('.')
+    majorVersionStr = version[:dot]
+    if dot < 1 or '.' in version[dot + 1:] or not majorVersionStr.isdecimal():
         raise Exception(f'No valid version found in file: "{os.path.normpath(sourcePath)}".')
 
-    if majorVersion > 1:
+    if int(majorVersionStr) > 1:
         raise Exception('The collection was created with a newer plugin version.')
 
+    pending = {}
+    dirFiles = {}
     targetRoot = ET.Element('COLLECTION')
     targetRoot.set('version', '1.0')
-    for xmlElement in xmlRoot:
-        if xmlElement.tag == xmlMap['book']:
-            targetBook = ET.SubElement(xmlRoot, 'BOOK')
-            set_element(xmlElement, targetBook, 'bk')
-        elif xmlElement.tag == xmlMap['series']:
-            targetSeries = ET.SubElement(targetRoot, 'SERIES')
-            set_element(xmlElement, targetSeries, 'sr')
-            for xmlBook in xmlElement.iter(xmlMap['book']):
-                targetBook = ET.SubElement(targetSeries, 'BOOK')
-                set_element(xmlBook, targetBook, 'bk')
-
-    indent(targetRoot)
-    xmlTree = ET.ElementTree(targetRoot)
+    bookTag = xmlMap['book']
+    idAttr = xmlMap['id']
+    titleTag = xmlMap['title']
+    descTag = xmlMap['desc']
+    pathTag = xmlMap['path']
+    depth = 1
+    for event, xmlElement in xmlEvents:
+        if event == 'start':
+            depth += 1
+            continue
+
+        depth -= 1
+        if depth != 1:
+            continue
+
+        target = targetElements.get(xmlElement.tag, None)
+        if target is not None:
+            targetTag, prefix = target
+            targetElement = ET.SubElement(targetRoot, targetTag)
+            set_element(xmlElement, targetElement, prefix)
+            if targetTag == 'SERIES':
+                for xmlBook in xmlElement:
+                    if xmlBook.tag == bookTag:
+                        targetBook = ET.SubElement(targetElement, 'BOOK')
+                        set_element(xmlBook, targetBook, 'bk')
+        xmlRoot.clear()
+
+    if len(pending) > 1:
+
+        with ProcessPoolExecutor() as executor:
+            for __ in executor.map(yw_novx, pending):
+                pass
+    else:
+        for yw7Path in pending:
+            yw_novx(yw7Path)
+
+    if hasattr(ET, 'indent'):
+        ET.indent(targetRoot)
+        targetRoot.tail = '\n'
+    else:
+        indent(targetRoot)
     backedUp = False
     if os.path.isfile(targetPath):
         os.replace(targetPath, f'{targetPath}.bak')
         backedUp = True
     try:
-        xmlTree.write(targetPath, encoding='utf-8')
+        with open(targetPath, 'w', encoding='utf-8', errors='xmlcharrefreplace') as f:
+            f.write(XML_HEADER)
+            ET.ElementTree(targetRoot).write(f, encoding='unicode')
     except:
         if backedUp:
             os.replace(f'{targetPath}.bak', targetPath)
         raise Exception(f'{_("Cannot write file")}: "{os.path.normpath(targetPath)}".')
 
-    postprocess_xml_file(targetPath)
-
 
 if __name__ == '__main__':
     convert(sys.argv[1])
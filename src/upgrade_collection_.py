@@ -10,6 +10,7 @@ License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
 """
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
 import xml.etree.ElementTree as ET
 
 from nvlib.model.xml.xml_indent import indent
@@ -20,51 +21,93 @@ XML_HEADER = '''<?xml version="1.0" encoding="utf-8"?>
 <?xml-stylesheet href="collection.css" type="text/css"?>
 '''
 
-
-def postprocess_xml_file(filePath):
-    """Postprocess an xml file created by ElementTree.
-    
-    Positional argument:
-        filePath -- str: path to xml file.
-    
-    Read the xml file, put a header on top. Overwrite the .nvcx xml file.
-    """
-    with open(filePath, 'r', encoding='utf-8') as f:
-        text = f.read()
-    with open(filePath, 'w', encoding='utf-8') as f:
-        f.write(f'{XML_HEADER}{text}')
+# There are different collection file versions.
+V1_MAP = {
+    'collection':'collection',
+    'series':'series',
+    'book':'book',
+    'id':'id',
+    'path':'path',
+    'title':'title',
+    'desc':'desc',
+}
+OLD_MAP = {
+    'collection':'COLLECTION',
+    'series':'SERIES',
+    'book':'BOOK',
+    'id':'ID',
+    'path':'Path',
+    'title':'Title',
+    'desc':'Desc',
+}
+SOURCE_MAPS = {
+    'collection':V1_MAP,
+    'COLLECTION':OLD_MAP,
+}
+
+# Target element tag and ID prefix by source element tag, for each version.
+TARGET_ELEMENTS = {
+    'collection':{
+        'book':('BOOK', 'bk'),
+        'series':('SERIES', 'sr'),
+    },
+    'COLLECTION':{
+        'BOOK':('BOOK', 'bk'),
+        'SERIES':('SERIES', 'sr'),
+    },
+}
 
 
 def convert(sourcePath):
 
+    def is_file(filePath):
+        # Use the directory listing, which is read only once per directory.
+        dirPath, fileName = os.path.split(os.path.normcase(filePath))
+        fileNames = dirFiles.get(dirPath, None)
+        if fileNames is None:
+            fileNames = set()
+            try:
+                with os.scandir(dirPath or '.') as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            fileNames.add(os.path.normcase(entry.name))
+            except OSError:
+                pass
+            dirFiles[dirPath] = fileNames
+        if fileName in fileNames:
+            return True
+
+        # The listing can miss files, e.g. with case-insensitive file systems or unreadable directories.
+        return os.path.isfile(filePath)
+
     def set_element(xmlElement, targetElement, prefix):
-        elemId = xmlElement.attrib[xmlMap['id']]
+        elemId = xmlElement.attrib[idAttr]
         targetElement.set('id', f"{prefix}{elemId}")
-        xmlTitle = xmlElement.find(xmlMap['title'])
+        xmlTitle = xmlElement.find(titleTag)
         if xmlTitle is not None:
             title = xmlTitle.text
             if title:
                 ET.SubElement(targetElement, 'Title').text = title
-        xmlDesc = xmlElement.find(xmlMap['desc'])
+        xmlDesc = xmlElement.find(descTag)
         if xmlDesc is not None:
             desc = xmlDesc.text
             if desc:
                 targetDesc = ET.SubElement(targetElement, 'Desc')
                 for paragraph in desc.split('\n'):
                     ET.SubElement(targetDesc, 'p').text = paragraph.strip()
-        xmlPath = xmlElement.find(xmlMap['path'])
+        xmlPath = xmlElement.find(pathTag)
         if xmlPath is not None:
 
             # xmlElement is BOOK.
             yw7Path = xmlPath.text
-            if yw7Path and os.path.isfile(yw7Path):
+            if yw7Path and is_file(yw7Path):
                 bookPath, bookExt = os.path.splitext(yw7Path)
                 if bookExt == '.yw7':
                     novxPath = f'{bookPath}.novx'
-                    if not os.path.isfile(novxPath):
+                    if not is_file(novxPath):
 
-                        # Convert book to .novx.
-                        yw_novx(yw7Path)
+                        # Book is converted to .novx after the tree is built.
+                        pending[yw7Path] = None
                     ET.SubElement(targetElement, 'Path').text = novxPath
 
     pathRoot , extension = os.path.splitext(sourcePath)
@@ -72,71 +115,85 @@ def convert(sourcePath):
         raise ValueError(f'File must be .pwc type, but is "{extension}".')
     targetPath = f'{pathRoot}.nvcx'
 
-    # There are different collection file versions.
-    v1Map = dict(
-            collection='collection',
-            series='series',
-            book='book',
-            id='id',
-            path='path',
-            title='title',
-            desc='desc',
-            )
-    oldMap = dict(
-            collection='COLLECTION',
-            series='SERIES',
-            book='BOOK',
-            id='ID',
-            path='Path',
-            title='Title',
-            desc='Desc',
-            )
-    xmlSourceTree = ET.parse(sourcePath)
-    xmlRoot = xmlSourceTree.getroot()
-    if xmlRoot.tag == v1Map['collection']:
-        xmlMap = v1Map
-    elif xmlRoot.tag == oldMap['collection']:
-        xmlMap = oldMap
-    else:
+    # Parse incrementally, so that memory use doesn't grow with the collection size.
+    xmlEvents = ET.iterparse(sourcePath, events=('start', 'end'))
+    __, xmlRoot = next(xmlEvents)
+    xmlMap = SOURCE_MAPS.get(xmlRoot.tag, None)
+    if xmlMap is None:
         raise Exception(f'No collection found in file: "{os.path.normpath(sourcePath)}".')
 
-    try:
-        majorVersionStr, minorVersionStr = xmlRoot.attrib['version'].split('.')
-        majorVersion = int(majorVersionStr)
-    except:
+    targetElements = TARGET_ELEMENTS[xmlRoot.tag]
+    version = xmlRoot.get('version', '')
+    dot = version.find('.')
+    majorVersionStr = version[:dot]
+    if dot < 1 or '.' in version[dot + 1:] or not majorVersionStr.isdecimal():
         raise Exception(f'No valid version found in file: "{os.path.normpath(sourcePath)}".')
 
-    if majorVersion > 1:
+    if int(majorVersionStr) > 1:
         raise Exception('The collection was created with a newer plugin version.')
 
+    pending = {}
+    dirFiles = {}
     targetRoot = ET.Element('COLLECTION')
     targetRoot.set('version', '1.0')
-    for xmlElement in xmlRoot:
-        if xmlElement.tag == xmlMap['book']:
-            targetBook = ET.SubElement(xmlRoot, 'BOOK')
-            set_element(xmlElement, targetBook, 'bk')
-        elif xmlElement.tag == xmlMap['series']:
-            targetSeries = ET.SubElement(targetRoot, 'SERIES')
-            set_element(xmlElement, targetSeries, 'sr')
-            for xmlBook in xmlElement.iter(xmlMap['book']):
-                targetBook = ET.SubElement(targetSeries, 'BOOK')
-                set_element(xmlBook, targetBook, 'bk')
-
-    indent(targetRoot)
-    xmlTree = ET.ElementTree(targetRoot)
+    bookTag = xmlMap['book']
+    idAttr = xmlMap['id']
+    titleTag = xmlMap['title']
+    descTag = xmlMap['desc']
+    pathTag = xmlMap['path']
+    depth = 1
+    for event, xmlElement in xmlEvents:
+        if event == 'start':
+            depth += 1
+            continue
+
+        depth -= 1
+        if depth != 1:
+            continue
+
+        # xmlElement is a complete child of the root.
+        target = targetElements.get(xmlElement.tag, None)
+        if target is not None:
+            targetTag, prefix = target
+            targetElement = ET.SubElement(targetRoot, targetTag)
+            set_element(xmlElement, targetElement, prefix)
+            if targetTag == 'SERIES':
+                for xmlBook in xmlElement:
+                    if xmlBook.tag == bookTag:
+                        targetBook = ET.SubElement(targetElement, 'BOOK')
+                        set_element(xmlBook, targetBook, 'bk')
+        xmlRoot.clear()
+
+    if len(pending) > 1:
+
+        # The books are independent of each other, so convert them in parallel.
+        with ProcessPoolExecutor() as executor:
+            for __ in executor.map(yw_novx, pending):
+                pass
+    else:
+        for yw7Path in pending:
+            yw_novx(yw7Path)
+
+    if hasattr(ET, 'indent'):
+        ET.indent(targetRoot)
+        # Unlike indent(), ElementTree.indent() leaves the root tail alone.
+        targetRoot.tail = '\n'
+    else:
+        # Python versions older than 3.9 lack ElementTree.indent().
+        indent(targetRoot)
     backedUp = False
     if os.path.isfile(targetPath):
         os.replace(targetPath, f'{targetPath}.bak')
         backedUp = True
     try:
-        xmlTree.write(targetPath, encoding='utf-8')
+        with open(targetPath, 'w', encoding='utf-8', errors='xmlcharrefreplace') as f:
+            f.write(XML_HEADER)
+            ET.ElementTree(targetRoot).write(f, encoding='unicode')
     except:
         if backedUp:
             os.replace(f'{targetPath}.bak', targetPath)
         raise Exception(f'{_("Cannot write file")}: "{os.path.normpath(targetPath)}".')
 
-    postprocess_xml_file(targetPath)
-
 
 if __name__ == '__main__':
     convert(sys.argv[1])